@@ -3,9 +3,14 @@ sofascore_metrics.py
 
 A flexible Python metaclass that scrapes SofaScore pages and dynamically
 creates classes representing individual football metrics (e.g. Ball Possession,
-Average Goals, Clean Sheets). Two scraping backends are included:
-- Requests + BeautifulSoup (lightweight, works if the data is in server-rendered HTML)
-- Playwright (headless browser for JS-rendered pages)
+Average Goals, Clean Sheets). Three scraping backends are included:
+- Requests + selectolax (lightweight, works if the data is in server-rendered HTML)
+- Playwright (headless browser for JS-rendered pages; sync, or async with a page pool)
+- SofaScore JSON API (no HTML at all; falls back to one of the above per metric)
+
+Parsed pages are selectolax LexborHTMLParser trees. Scrapers built with
+bs4_compat=True return BeautifulSoup objects instead, for callers whose custom
+extractors still expect a soup; the built-in extractors accept either.
 
 DISCLAIMER & IMPORTANT NOTES
 - Check SofaScore's Terms of Service / robots.txt before scraping. Respect rate limits
@@ -14,172 +19,857 @@ DISCLAIMER & IMPORTANT NOTES
   The Requests backend will only work when the HTML includes the metric data.
 """
 
-from typing import Callable, Dict, Optional, Tuple
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import atexit
 import re
+import threading
 import time
 
 # External deps
-# pip install requests bs4 playwright
+# pip install requests selectolax playwright
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+
+# Optional import for the BeautifulSoup compatibility mode (bs4_compat=True):
+# pip install bs4 lxml
+try:
+    from bs4 import BeautifulSoup
+    import soupsieve
+    _BS4_AVAILABLE = True
+except ImportError:
+    BeautifulSoup = soupsieve = None
+    _BS4_AVAILABLE = False
+
+# Optional HTTP/2 client (multiplexes requests to one host over a single TLS connection):
+# pip install "httpx[http2]"
+try:
+    import httpx
+    import h2  # noqa: F401
+    _HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    _HTTPX_AVAILABLE = False
+
+# Optional persistent HTTP cache (disk_cache=...); revalidates with ETag/Last-Modified:
+# pip install requests-cache
+try:
+    import requests_cache
+    _REQUESTS_CACHE_AVAILABLE = True
+except ImportError:
+    requests_cache = None
+    _REQUESTS_CACHE_AVAILABLE = False
+
+# Only advertise Brotli when a decoder is installed; requests/httpx cannot decode it otherwise.
+# pip install brotli
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "br, gzip"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip"
+
+# Prefer the C-backed lxml parser; fall back to the pure-Python one if lxml is missing.
+try:
+    import lxml  # noqa: F401
+    _PARSER = "lxml"
+except ImportError:
+    _PARSER = "html.parser"
 
 # Optional import for Playwright. If you want to use it, ensure it's installed and installed browsers:
 # pip install playwright
 # python -m playwright install
 try:
-    from playwright.sync_api import sync_playwright
+    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+    from playwright.async_api import async_playwright
     _PLAYWRIGHT_AVAILABLE = True
 except Exception:
     _PLAYWRIGHT_AVAILABLE = False
 
+# Requests Playwright aborts: resources that do not affect the rendered metric text.
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+_BLOCKED_URL_PARTS = ("googletagmanager", "google-analytics", "doubleclick", "hotjar")
+
+
+def _is_unneeded(request) -> bool:
+    return request.resource_type in _BLOCKED_RESOURCE_TYPES or any(d in request.url for d in _BLOCKED_URL_PARTS)
+
+
+def _block_unneeded(route) -> None:
+    if _is_unneeded(route.request):
+        route.abort()
+    else:
+        route.continue_()
+
+
+async def _block_unneeded_async(route) -> None:
+    if _is_unneeded(route.request):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+#######################
+# Tree helpers
+#######################
+# Tags that may hold a metric label in the heuristic search.
+_LABEL_TAGS = ["div", "span", "p", "td", "th"]
+_LABEL_CSS = ",".join(_LABEL_TAGS)
+# selectolax exposes text/comment nodes as siblings; BS4's find_next_sibling() skips them.
+_NON_ELEMENT_TAGS = frozenset({"-text", "-comment"})
+# Numeric token (optionally a percentage) used when a label has no value sibling.
+_TAIL_NUM_RE = re.compile(r"(\d+(?:\.\d+)?%?)")
+# Compiled soupsieve selectors for BeautifulSoup trees, keyed by CSS selector string.
+_COMPILED_SELECTORS: Dict[str, Any] = {}
+
+# Common labels we might find on a team page summary (language-dependent), fused into
+# one alternation so a single scan of a node's text finds every label it contains.
+_LABEL_RE = re.compile(
+    r"(?P<ball_possession>ball possession)"
+    r"|(?P<avg_goals>avg\.? goals|goals per match|average goals)"
+    r"|(?P<clean_sheets>clean sheets?)"
+    r"|(?P<goals>^goals$)"
+    r"|(?P<on_target>on target)",
+    re.I,
+)
+_GROUP_TO_LABEL = {
+    "ball_possession": "Ball possession",
+    "avg_goals": "Average goals",
+    "clean_sheets": "Clean sheets",
+    "goals": "Goals",
+    "on_target": "Shots on target",
+}
+
+
+def _parse_html(html: str, bs4_compat: bool = False):
+    """Parse html into a LexborHTMLParser tree, or a BeautifulSoup if bs4_compat."""
+    if bs4_compat:
+        return BeautifulSoup(html, _PARSER)
+    return LexborHTMLParser(html)
+
+
+def _node_text(node, separator: str = "", strip: bool = False) -> str:
+    if isinstance(node, LexborNode):
+        return node.text(separator=separator, strip=strip)
+    return node.get_text(separator, strip=strip)
+
+
+def _next_element(node):
+    """Next element sibling of node (text and comment nodes are skipped).
+    Follows sibling pointers directly rather than going through BS4's
+    find_next_sibling() search machinery."""
+    if isinstance(node, LexborNode):
+        sib = node.next
+        while sib is not None and sib.tag in _NON_ELEMENT_TAGS:
+            sib = sib.next
+        return sib
+    sib = node.next_sibling
+    while sib is not None and sib.name is None:  # NavigableString / Comment
+        sib = sib.next_sibling
+    return sib
+
+
+def _select_text(tree, selector: str) -> Optional[str]:
+    """Stripped text of the first node matching the CSS selector, or None."""
+    if isinstance(tree, LexborHTMLParser):
+        node = tree.css_first(selector)
+        return node.text(strip=True) if node else None
+    compiled = _COMPILED_SELECTORS.get(selector)
+    if compiled is None:
+        compiled = _COMPILED_SELECTORS.setdefault(selector, soupsieve.compile(selector))
+    el = compiled.select_one(tree)
+    if not el:
+        return None
+    return el.get_text(strip=True)
+
+
+class _SelectorExtractor:
+    """Extractor returning the stripped text of the first node matching sel.
+    Holds only the selector string, so it never pins a parsed tree in memory."""
+
+    __slots__ = ("sel",)
+
+    def __init__(self, sel: str):
+        self.sel = sel
+
+    def __call__(self, tree) -> Optional[str]:
+        return _select_text(tree, self.sel)
+
+
+# One shared extractor per selector string, across all scrapers and metric classes.
+_EXTRACTOR_CACHE: Dict[str, _SelectorExtractor] = {}
+
+
+def _selector_extractor(sel: str) -> _SelectorExtractor:
+    ex = _EXTRACTOR_CACHE.get(sel)
+    if ex is None:
+        ex = _EXTRACTOR_CACHE.setdefault(sel, _SelectorExtractor(sel))
+    return ex
+
+
+def _find_label_nodes(tree, labels: Optional[Iterable[str]] = None) -> Dict[str, Tuple[Any, str]]:
+    """Single pass over the candidate tags, returning label -> (node, node text) for
+    the first node whose text matches that heuristic label (see _LABEL_RE). Each
+    node's text is materialized once and handed back so callers need not redo it.
+    labels restricts which labels are wanted; the walk stops once all are found."""
+    remaining = set(_GROUP_TO_LABEL.values() if labels is None else labels)
+    if isinstance(tree, LexborHTMLParser):
+        nodes = tree.css(_LABEL_CSS)
+    else:
+        nodes = tree.find_all(_LABEL_TAGS)
+    found: Dict[str, Tuple[Any, str]] = {}
+    for node in nodes:
+        text = _node_text(node, " ")
+        if not text:
+            continue
+        for m in _LABEL_RE.finditer(text):
+            label = _GROUP_TO_LABEL[m.lastgroup]
+            if label in remaining:
+                found[label] = (node, text)
+                remaining.discard(label)
+        if not remaining:
+            break
+    return found
+
+
+def _sibling_value(node) -> Optional[str]:
+    """Text of the label's next sibling, else of its parent's next sibling."""
+    sib = _next_element(node)
+    if sib is not None:
+        val = _node_text(sib, strip=True)
+        if val:
+            return val
+    if node.parent is not None:
+        nextp = _next_element(node.parent)
+        if nextp is not None:
+            return _node_text(nextp, strip=True)
+    return None
+
+
+def _label_value(tree, label: str) -> Optional[str]:
+    """Value next to a heuristic label in tree: sibling, then parent's sibling,
+    then the nearest numeric token in the label/parent text."""
+    hit = _find_label_nodes(tree, (label,)).get(label)
+    if hit is None:
+        return None
+    node, node_txt = hit
+    val = _sibling_value(node)
+    if val:
+        return val
+    # The first token in the label's own text wins; the parent's text is only
+    # materialized when the label has none.
+    m = _TAIL_NUM_RE.search(node_txt)
+    if not m and node.parent is not None:
+        m = _TAIL_NUM_RE.search(_node_text(node.parent, " "))
+    return m.group(1) if m else None
+
+
+def _heuristic_extractors(tree) -> Dict[str, Callable[[Any], Optional[str]]]:
+    """Extractors for the heuristic labels present in tree. Discovery records only
+    the label; each extractor re-reads it from the tree it is called with."""
+    found = _find_label_nodes(tree)
+    return {label: (lambda t, label=label: _label_value(t, label))
+            for label in _GROUP_TO_LABEL.values() if label in found}
+
+
+_MAX_AGE_RE = re.compile(r"\bmax-age=(\d+)", re.I)
+_NO_CACHE_RE = re.compile(r"\bno-(?:store|cache)\b", re.I)
+
+
+def _ttl_from_headers(headers, default: float) -> float:
+    """Cache lifetime implied by Cache-Control or Expires, else default.
+    no-store/no-cache and an unparseable Expires mean "do not reuse" (0)."""
+    cache_control = headers.get("Cache-Control", "")
+    if _NO_CACHE_RE.search(cache_control):
+        return 0.0
+    m = _MAX_AGE_RE.search(cache_control)
+    if m:
+        return float(m.group(1))
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return max(0.0, parsedate_to_datetime(expires).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 0.0
+    return default
+
+
+class _TreeCache:
+    """In-memory TTL cache of parsed trees keyed by URL, so the metric classes
+    generated from one page share a single fetch + parse. A small LRU keyed by
+    (url, ETag) additionally lets an unchanged response skip re-parsing.
+    """
+
+    _etag_lru_size = 32
+
+    def _init_cache(self, ttl: float) -> None:
+        self._soup_ttl = ttl
+        self._soup_cache: Dict[str, Tuple[float, Any]] = {}  # url -> (expires_at, tree)
+        self._etag_trees: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._soup_lock = threading.Lock()
+
+    def _cache_get(self, url: str):
+        with self._soup_lock:
+            hit = self._soup_cache.get(url)
+            if hit is None:
+                return None
+            if time.monotonic() < hit[0]:
+                return hit[1]
+            # Drop the expired tree so it is not kept alive until the next put.
+            del self._soup_cache[url]
+            return None
+
+    def _cache_put(self, url: str, tree, ttl: Optional[float] = None) -> None:
+        ttl = self._soup_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._soup_lock:
+            for key in [k for k, (expires_at, _) in self._soup_cache.items() if expires_at <= now]:
+                del self._soup_cache[key]
+            self._soup_cache[url] = (now + ttl, tree)
+
+    def _etag_get(self, url: str, etag: str):
+        with self._soup_lock:
+            tree = self._etag_trees.get((url, etag))
+            if tree is not None:
+                self._etag_trees.move_to_end((url, etag))
+            return tree
+
+    def _etag_put(self, url: str, etag: str, tree) -> None:
+        with self._soup_lock:
+            self._etag_trees[(url, etag)] = tree
+            self._etag_trees.move_to_end((url, etag))
+            while len(self._etag_trees) > self._etag_lru_size:
+                self._etag_trees.popitem(last=False)
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """Drop the cached tree for url, or every cached tree if url is None."""
+        with self._soup_lock:
+            if url is None:
+                self._soup_cache.clear()
+                self._etag_trees.clear()
+            else:
+                self._soup_cache.pop(url, None)
+                for key in [k for k in self._etag_trees if k[0] == url]:
+                    del self._etag_trees[key]
+
+
+def _make_http2_client(headers: Dict[str, str]) -> "httpx.Client":
+    """HTTP/2 httpx client with the same pool limits as _make_session. The transport
+    carries the HTTP/2, retry and pool settings; httpx ignores them on the Client
+    when a transport is given."""
+    return httpx.Client(
+        headers=headers,
+        follow_redirects=True,
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        ),
+    )
+
+
+def _make_session(headers: Dict[str, str], cache_name: Optional[str] = None) -> requests.Session:
+    """Pooled keep-alive session so repeated fetches reuse TCP/TLS connections.
+    With cache_name, responses are also kept in a requests-cache SQLite database and
+    stale entries are revalidated with If-None-Match/If-Modified-Since."""
+    if cache_name:
+        s = requests_cache.CachedSession(cache_name=cache_name, backend="sqlite",
+                                         expire_after=300, cache_control=True)
+    else:
+        s = requests.Session()
+    s.headers.update(headers)
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
 
 #######################
 # Scraper implementations
 #######################
-class RequestsScraper:
-    """Simple scraper using requests + BeautifulSoup.
+class RequestsScraper(_TreeCache):
+    """Simple scraper using requests + selectolax.
     Works when the target page has the metric data in the server-rendered HTML.
     """
 
     headers = {
-        "User-Agent": "sofascore-metrics-bot/1.0 (+https://example.com/contact)"
+        "User-Agent": "sofascore-metrics-bot/1.0 (+https://example.com/contact)",
+        "Accept-Encoding": _ACCEPT_ENCODING,
+        "Accept-Language": "en",
     }
 
-    def fetch_soup(self, url: str, timeout: int = 10) -> BeautifulSoup:
-        r = requests.get(url, headers=self.headers, timeout=timeout)
+    def __init__(self, bs4_compat: bool = False, cache_ttl: float = 60.0, http2: bool = False,
+                 disk_cache: Optional[str] = None):
+        """http2: opt in to an HTTP/2 httpx client (needs httpx and h2; otherwise the
+        pooled requests.Session is used). With it, fetch errors are httpx exceptions
+        rather than requests.RequestException, and only failed connections are
+        retried, not 429/5xx responses.
+        disk_cache: name of a persistent requests-cache database (e.g. ".sofascore_cache");
+        implies the requests.Session backend."""
+        if bs4_compat and not _BS4_AVAILABLE:
+            raise RuntimeError("bs4_compat requires BeautifulSoup. Install bs4.")
+        if disk_cache and not _REQUESTS_CACHE_AVAILABLE:
+            raise RuntimeError("disk_cache requires requests-cache. Install requests-cache.")
+        self.bs4_compat = bs4_compat
+        self._init_cache(cache_ttl)
+        # requests.Session or httpx.Client; both expose get(url, timeout=...)
+        if http2 and _HTTPX_AVAILABLE and not disk_cache:
+            self._session = _make_http2_client(self.headers)
+        else:
+            self._session = _make_session(self.headers, disk_cache)
+
+    def close(self) -> None:
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def fetch_soup(self, url: str, timeout: int = 10) -> LexborHTMLParser:
+        tree = self._cache_get(url)
+        if tree is not None:
+            return tree
+        r = self._session.get(url, timeout=timeout)
         r.raise_for_status()
-        return BeautifulSoup(r.text, "html.parser")
+        # An unchanged ETag (e.g. a revalidated disk-cache hit) means the body is the same.
+        etag = r.headers.get("ETag")
+        tree = self._etag_get(url, etag) if etag else None
+        if tree is None:
+            tree = _parse_html(r.text, self.bs4_compat)
+            if etag:
+                self._etag_put(url, etag, tree)
+        # cache_ttl is an upper bound: headers may shorten the lifetime, never extend it.
+        self._cache_put(url, tree, min(self._soup_ttl, _ttl_from_headers(r.headers, self._soup_ttl)))
+        return tree
 
-    def extract_by_selector(self, soup: BeautifulSoup, selector: str) -> Optional[str]:
-        el = soup.select_one(selector)
-        if not el:
-            return None
-        return el.get_text(strip=True)
+    def extract_by_selector(self, tree: LexborHTMLParser, selector: str) -> Optional[str]:
+        return _select_text(tree, selector)
 
     def find_metrics(self, url: str, metric_selectors: Optional[Dict[str, str]] = None
-                    ) -> Dict[str, Callable[[BeautifulSoup], Optional[str]]]:
+                    ) -> Dict[str, Callable[[LexborHTMLParser], Optional[str]]]:
         """
         If metric_selectors is provided (mapping metric_name -> CSS selector),
         return extractors based on those selectors. Otherwise try to guess
         some common metrics by searching document text (best-effort).
-        Returns mapping metric_name -> extractor(soup) -> value str or None.
+        Returns mapping metric_name -> extractor(tree) -> value str or None.
         """
         if metric_selectors:
-            def make_extractor(sel: str):
-                return lambda soup: self.extract_by_selector(soup, sel)
-            return {name: make_extractor(sel) for name, sel in metric_selectors.items()}
-
-        # Best-effort heuristics for common metrics: look for label/value pairs
-        soup = self.fetch_soup(url)
-        mapping = {}
-
-        # Common labels we might find on a team page summary (language-dependent).
-        candidates = {
-            "Ball possession": re.compile(r"ball possession", re.I),
-            "Average goals": re.compile(r"avg(?:\.|) goals|goals per match|average goals", re.I),
-            "Clean sheets": re.compile(r"clean sheets?", re.I),
-            "Goals": re.compile(r"^goals$", re.I),
-            "Shots on target": re.compile(r"on target", re.I),
-        }
+            return {name: _selector_extractor(sel) for name, sel in metric_selectors.items()}
 
-        # Attempt: find label nodes and their sibling/parent values
+        # Best-effort heuristics for common metrics: look for label/value pairs.
+        # The full tree is cached, so the first fetch_raw reuses this download.
+        tree = self.fetch_soup(url)
         # This is heuristic — you should provide exact selectors for reliable results.
-        for label_text, label_re in candidates.items():
-            label_node = soup.find(lambda tag: tag.name in ["div", "span", "p", "td", "th"] and tag.get_text(strip=True) and label_re.search(tag.get_text(" ")))
-            if label_node:
-                # try sibling
-                val = None
-                # sibling
-                sib = label_node.find_next_sibling()
-                if sib:
-                    val = sib.get_text(strip=True)
-                # parent sibling
-                if not val and label_node.parent:
-                    nextp = label_node.parent.find_next_sibling()
-                    if nextp:
-                        val = nextp.get_text(strip=True)
-                # fallback: nearest numeric token in next 120 characters
-                if not val:
-                    tail = label_node.get_text(" ") + " " + (label_node.parent.get_text(" ") if label_node.parent else "")
-                    m = re.search(r"(\d+(?:\.\d+)?%?)", tail)
-                    val = m.group(1) if m else None
-
-                if val:
-                    mapping[label_text] = (lambda captured_val=val: (lambda soup: captured_val))
-                else:
-                    # construct an extractor that tries to find again at fetch time
-                    def make_lazy_extractor(lr=label_re):
-                        def extractor(soup):
-                            node = soup.find(lambda tag: tag.name in ["div", "span", "p", "td", "th"] and tag.get_text(strip=True) and lr.search(tag.get_text(" ")))
-                            if not node:
-                                return None
-                            sib = node.find_next_sibling()
-                            if sib:
-                                return sib.get_text(strip=True)
-                            if node.parent:
-                                nextp = node.parent.find_next_sibling()
-                                if nextp:
-                                    return nextp.get_text(strip=True)
-                            m = re.search(r"(\d+(?:\.\d+)?%?)", node.get_text(" "))
-                            return m.group(1) if m else None
-                        return extractor
-                    mapping[label_text] = make_lazy_extractor()
-        return mapping
+        return _heuristic_extractors(tree)
 
 
-class PlaywrightScraper:
-    """Scraper using Playwright to render JS-heavy SofaScore pages.
-    Uses the sync Playwright API. Requires playwright to be installed.
-    """
+class _PlaywrightBase(_TreeCache, ABC):
+    """Shared setup, readiness waiting, tree caching and metric discovery for the
+    Playwright scrapers. Subclasses launch the browser and implement _render()."""
 
-    def __init__(self, headless: bool = True, timeout: int = 10_000):
+    def _init_playwright(self, headless: bool, timeout: int, bs4_compat: bool, cache_ttl: float) -> None:
         if not _PLAYWRIGHT_AVAILABLE:
             raise RuntimeError("Playwright is not available. Install playwright and run 'playwright install'.")
+        if bs4_compat and not _BS4_AVAILABLE:
+            raise RuntimeError("bs4_compat requires BeautifulSoup. Install bs4.")
         self.headless = headless
         self.timeout = timeout
+        self.bs4_compat = bs4_compat
+        self._init_cache(cache_ttl)
+        # url -> CSS selector whose presence means the page's metrics have rendered
+        self._ready_selectors: Dict[str, str] = {}
 
-    def fetch_html(self, url: str) -> str:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=self.headless)
-            try:
-                page = browser.new_page()
-                page.goto(url, timeout=self.timeout)
-                # wait some sensible time for metrics to load
-                page.wait_for_timeout(1500)
-                return page.content()
-            finally:
-                browser.close()
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _wait_until_ready(self, page, wait_for: Optional[str]):
+        """Wait until the wait_for selector is attached, or for network idle when no
+        selector is given. Returns the page call's result (a coroutine on async pages);
+        callers swallow PlaywrightTimeoutError and keep the HTML rendered so far."""
+        if wait_for:
+            return page.wait_for_selector(wait_for, state="attached", timeout=self.timeout)
+        return page.wait_for_load_state("networkidle", timeout=self.timeout)
 
-    def fetch_soup(self, url: str) -> BeautifulSoup:
-        html = self.fetch_html(url)
-        return BeautifulSoup(html, "html.parser")
+    @abstractmethod
+    def _render(self, url: str, wait_for: Optional[str]) -> str:
+        """Render url in the browser and return its HTML."""
+
+    def fetch_soup(self, url: str, wait_for: Optional[str] = None) -> LexborHTMLParser:
+        tree = self._cache_get(url)
+        if tree is not None:
+            return tree
+        html = self._render(url, wait_for or self._ready_selectors.get(url))
+        tree = _parse_html(html, self.bs4_compat)
+        self._cache_put(url, tree)
+        return tree
 
     def find_metrics(self, url: str, metric_selectors: Optional[Dict[str, str]] = None
-                    ) -> Dict[str, Callable[[BeautifulSoup], Optional[str]]]:
+                    ) -> Dict[str, Callable[[LexborHTMLParser], Optional[str]]]:
         # Reuse RequestsScraper behavior but fetch via Playwright
-        soup = self.fetch_soup(url)
-        rs = RequestsScraper()
         if metric_selectors:
-            def make_extractor(sel: str):
-                return lambda _: rs.extract_by_selector(soup, sel)
-            return {name: make_extractor(sel) for name, sel in metric_selectors.items()}
-        # fall back to heuristic detection like RequestsScraper
-        return RequestsScraper().find_metrics(url, None)
+            # Later fetches of this url wait for the first metric to render.
+            self._ready_selectors[url] = next(iter(metric_selectors.values()))
+            # Extractors run on the tree fetch_raw passes in, never a discovery-time copy.
+            return {name: _selector_extractor(sel) for name, sel in metric_selectors.items()}
+        # fall back to heuristic detection like RequestsScraper, on the rendered page
+        return _heuristic_extractors(self.fetch_soup(url))
+
+
+class PlaywrightScraper(_PlaywrightBase):
+    """Scraper using Playwright to render JS-heavy SofaScore pages.
+    Uses the sync Playwright API. Requires playwright to be installed.
+    One browser and context are launched per scraper and reused for every fetch;
+    call close() (or rely on the atexit hook) to shut them down.
+    Sync Playwright objects belong to the thread that created them, so the scraper
+    may only render pages and close from the thread that constructed it; use
+    AsyncPlaywrightScraper to scrape from several threads.
+    """
+
+    def __init__(self, headless: bool = True, timeout: int = 10_000, bs4_compat: bool = False,
+                 cache_ttl: float = 60.0):
+        self._init_playwright(headless, timeout, bs4_compat, cache_ttl)
+        self._owner_thread = threading.get_ident()
+        self._pw = sync_playwright().start()
+        try:
+            self._browser = self._pw.chromium.launch(headless=self.headless)
+            self._context = self._browser.new_context()
+            self._context.route("**/*", _block_unneeded)
+        except Exception:
+            self._pw.stop()
+            raise
+        atexit.register(self.close)
+
+    def _check_thread(self) -> None:
+        if threading.get_ident() != self._owner_thread:
+            raise RuntimeError("PlaywrightScraper can only be used from the thread that created it")
+
+    def close(self) -> None:
+        if self._pw is None:
+            return
+        self._check_thread()
+        try:
+            self._context.close()
+            self._browser.close()
+        finally:
+            self._pw.stop()
+            self._pw = None
+        atexit.unregister(self.close)
+
+    def fetch_html(self, url: str, wait_for: Optional[str] = None) -> str:
+        """Render url and return its HTML, waiting as described in _wait_until_ready."""
+        if self._pw is None:
+            raise RuntimeError("PlaywrightScraper is closed")
+        self._check_thread()
+        page = self._context.new_page()
+        try:
+            page.goto(url, wait_until="domcontentloaded", timeout=self.timeout)
+            try:
+                self._wait_until_ready(page, wait_for)
+            except PlaywrightTimeoutError:
+                pass
+            return page.content()
+        finally:
+            page.close()
+
+    _render = fetch_html
+
+
+class AsyncPlaywrightScraper(_PlaywrightBase):
+    """Playwright scraper on the async API for high-throughput scraping: one shared
+    browser/context renders up to `concurrency` pages at once.
+
+    The browser lives on a private event-loop thread and only the sync API is
+    exposed: fetch_soup, fetch_many and find_metrics work from any thread,
+    including MetricBase.fetch_many's worker threads.
+    """
+
+    def __init__(self, headless: bool = True, timeout: int = 10_000, bs4_compat: bool = False,
+                 cache_ttl: float = 60.0, concurrency: int = 8):
+        self._init_playwright(headless, timeout, bs4_compat, cache_ttl)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="playwright-async", daemon=True)
+        self._thread.start()
+        try:
+            self._run(self._start(concurrency))
+        except Exception:
+            self._stop_loop()
+            raise
+        atexit.register(self.close)
+
+    def _run(self, coro):
+        """Run coro on the scraper's event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _start(self, concurrency: int) -> None:
+        self._sem = asyncio.Semaphore(concurrency)
+        self._pw = await async_playwright().start()
+        try:
+            self._browser = await self._pw.chromium.launch(headless=self.headless)
+            self._context = await self._browser.new_context()
+            await self._context.route("**/*", _block_unneeded_async)
+        except Exception:
+            await self._pw.stop()
+            raise
+
+    async def _shutdown(self) -> None:
+        try:
+            await self._context.close()
+            await self._browser.close()
+        finally:
+            await self._pw.stop()
+
+    def _stop_loop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def close(self) -> None:
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                self._run(self._shutdown())
+            finally:
+                self._stop_loop()
+        atexit.unregister(self.close)
+
+    async def _fetch_html(self, url: str, wait_for: Optional[str] = None) -> str:
+        """Render url on a new page of the shared context (at most `concurrency`
+        at a time). Must run on the scraper's own loop, via _run()."""
+        async with self._sem:
+            page = await self._context.new_page()
+            try:
+                await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout)
+                try:
+                    await self._wait_until_ready(page, wait_for)
+                except PlaywrightTimeoutError:
+                    pass
+                return await page.content()
+            finally:
+                await page.close()
+
+    def _render(self, url: str, wait_for: Optional[str]) -> str:
+        if self._closed:
+            raise RuntimeError("AsyncPlaywrightScraper is closed")
+        return self._run(self._fetch_html(url, wait_for))
+
+    def fetch_many(self, urls: Iterable[str]) -> Dict[str, LexborHTMLParser]:
+        """Render every url concurrently and return url -> parsed tree."""
+        trees: Dict[str, Any] = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            tree = self._cache_get(url)
+            if tree is None:
+                pending.append(url)
+            else:
+                trees[url] = tree
+        if pending:
+            if self._closed:
+                raise RuntimeError("AsyncPlaywrightScraper is closed")
+
+            async def render_all():
+                return await asyncio.gather(*(self._fetch_html(u, self._ready_selectors.get(u)) for u in pending))
+
+            for url, html in zip(pending, self._run(render_all())):
+                trees[url] = _parse_html(html, self.bs4_compat)
+                self._cache_put(url, trees[url])
+        return trees
+
+
+def _team_id(url: str) -> Optional[str]:
+    """Last path segment of a /team/ URL if it is numeric, e.g. "42" for
+    https://www.sofascore.com/team/football/arsenal/42 (numeric slugs such as
+    /team/football/1860/5 are skipped); None otherwise."""
+    segments = [seg for seg in urlsplit(url).path.split("/") if seg]
+    if "team" not in segments[:-1] or not segments[-1].isdigit():
+        return None
+    return segments[-1]
+
+
+def _dotted_get(data, path: str):
+    """Follow a dotted path like "statistics.ballPossession" (list indices allowed)."""
+    for part in path.split("."):
+        if isinstance(data, dict):
+            data = data.get(part)
+        elif isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        else:
+            return None
+        if data is None:
+            return None
+    return data
+
+
+class _APIPage:
+    """What JSONAPIScraper.fetch_soup returns for a SofaScore URL: lazily fetched,
+    memoized API responses plus the rendered HTML tree for selector-based metrics.
+    Safe to share between threads: each endpoint is requested at most once."""
+
+    def __init__(self, scraper: "JSONAPIScraper", url: str):
+        self.url = url
+        self.team_id = _team_id(url)
+        self._scraper = scraper
+        self._responses: Dict[str, Any] = {}
+        self._tree = None
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}  # one per endpoint, plus "html"
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def json(self, endpoint_template: str):
+        with self._key_lock(endpoint_template):
+            data = self._responses.get(endpoint_template)
+            if data is None:
+                if self.team_id is None:
+                    raise RuntimeError(f"Could not find a team id in SofaScore URL: {self.url}")
+                data = self._scraper.fetch_json(endpoint_template.format(team_id=self.team_id))
+                self._responses[endpoint_template] = data
+            return data
+
+    def html_tree(self):
+        with self._key_lock("html"):
+            if self._tree is None:
+                self._tree = self._scraper.fallback.fetch_soup(self.url)
+            return self._tree
+
+
+class JSONAPIScraper:
+    """Scraper that reads metrics from SofaScore's JSON API (the endpoints its own
+    frontend calls) instead of rendering and parsing HTML.
+
+    metric_selectors values may be (endpoint_template, dotted_path) tuples, e.g.
+    ("/api/v1/team/{team_id}/statistics/overall", "statistics.ballPossession"),
+    which are answered from the API. Plain CSS selectors, and heuristic discovery
+    when no selectors are given, fall back to the HTML scraper in `fallback`.
+    API responses are revalidated with ETag/Last-Modified conditional requests.
+    """
+
+    api_base = "https://api.sofascore.com"
+    headers = RequestsScraper.headers
+    _json_lru_size = 128
+
+    def __init__(self, fallback=None, timeout: int = 10):
+        # A fallback we create is ours to close; one passed in belongs to the caller.
+        self._owns_fallback = fallback is None
+        self.fallback = fallback if fallback is not None else RequestsScraper()
+        self.timeout = timeout
+        self._session = _make_session(self.headers)
+        self._json_cache: "OrderedDict[str, Tuple[Dict[str, str], Any]]" = OrderedDict()  # url -> (validators, data)
+        self._json_lock = threading.Lock()
+
+    def close(self) -> None:
+        try:
+            self._session.close()
+        finally:
+            if self._owns_fallback:
+                self.fallback.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def fetch_json(self, endpoint: str):
+        url = self.api_base + endpoint
+        with self._json_lock:
+            cached = self._json_cache.get(url)
+            if cached:
+                self._json_cache.move_to_end(url)
+        req_headers = {}
+        if cached:
+            validators = cached[0]
+            if "ETag" in validators:
+                req_headers["If-None-Match"] = validators["ETag"]
+            if "Last-Modified" in validators:
+                req_headers["If-Modified-Since"] = validators["Last-Modified"]
+        r = self._session.get(url, headers=req_headers, timeout=self.timeout)
+        if r.status_code == 304 and cached:
+            return cached[1]
+        r.raise_for_status()
+        data = r.json()
+        validators = {k: r.headers[k] for k in ("ETag", "Last-Modified") if k in r.headers}
+        if validators:
+            with self._json_lock:
+                self._json_cache[url] = (validators, data)
+                self._json_cache.move_to_end(url)
+                while len(self._json_cache) > self._json_lru_size:
+                    self._json_cache.popitem(last=False)
+        return data
+
+    def fetch_soup(self, url: str) -> _APIPage:
+        return _APIPage(self, url)
+
+    def find_metrics(self, url: str, metric_selectors: Optional[Dict[str, Any]] = None
+                    ) -> Dict[str, Callable[[_APIPage], Optional[str]]]:
+        if not metric_selectors:
+            html_extractors = self.fallback.find_metrics(url, None)
+            return {name: self._via_html(ex) for name, ex in html_extractors.items()}
+
+        css = {name: sel for name, sel in metric_selectors.items() if isinstance(sel, str)}
+        html_extractors = self.fallback.find_metrics(url, css) if css else {}
+        mapping = {}
+        for name, spec in metric_selectors.items():
+            if isinstance(spec, str):
+                mapping[name] = self._via_html(html_extractors[name])
+            else:
+                mapping[name] = self._via_api(*spec)
+        return mapping
+
+    @staticmethod
+    def _via_api(endpoint_template: str, path: str) -> Callable[[_APIPage], Optional[str]]:
+        def extractor(page: _APIPage) -> Optional[str]:
+            val = _dotted_get(page.json(endpoint_template), path)
+            return None if val is None else str(val)
+        return extractor
+
+    @staticmethod
+    def _via_html(extractor) -> Callable[[_APIPage], Optional[str]]:
+        return lambda page: extractor(page.html_tree())
 
 
 #######################
 # Metric metaclass & base
 #######################
+# Numeric metric text: a whole number/percentage ("43%", "1.25", "12"), or a number embedded in text.
+_NUM_FULL = re.compile(r"^(-?\d+(?:\.\d+)?)\s*(%?)$")
+_NUM_EMBED = re.compile(r"(-?\d+(?:\.\d+)?)")
+# Characters stripped from a metric name to build its generated class name.
+_CLASS_NAME_RE = re.compile(r"[^0-9a-zA-Z]+")
+
+
 class MetricBase:
     """Base for generated metric classes. Generated classes attach:
     - metric_name (str)
-    - extractor: Callable[[BeautifulSoup], Optional[str]]         (class attr _extractor)
+    - extractor: Callable[[LexborHTMLParser], Optional[str]]     (class attr _extractor)
     - sofascore_url (str), and optionally 'scraper' (object with fetch_soup)
     """
 
     metric_name: str = "unnamed"
     sofascore_url: Optional[str] = None
-    _extractor: Optional[Callable[[BeautifulSoup], Optional[str]]] = None
+    _extractor: Optional[Callable[[LexborHTMLParser], Optional[str]]] = None
     _scraper_instance = None  # will be set to a scraper object that has fetch_soup(url)
 
     @classmethod
@@ -196,8 +886,64 @@ class MetricBase:
         if not cls._extractor:
             raise RuntimeError("extractor not provided for metric")
         scraper = cls._get_scraper()
-        soup = scraper.fetch_soup(cls.sofascore_url)
-        return cls._extractor(soup)
+        tree = scraper.fetch_soup(cls.sofascore_url)
+        return cls._extractor(tree)
+
+    @classmethod
+    def fetch_many(cls, metric_classes: Iterable[type], max_workers: int = 10) -> Dict[type, Optional[str]]:
+        """Fetch raw values for many metric classes at once.
+        Each distinct (scraper, sofascore_url) is fetched once, and the fetches run in
+        parallel threads; every class's extractor then runs as its own pool task on the
+        shared tree, so extractors that do their own I/O (JSONAPIScraper's API calls)
+        overlap too. Playwright's sync API is bound to the thread that started it, so
+        work for a PlaywrightScraper (directly or as a JSON fallback) stays on the
+        calling thread.
+        """
+        default_scraper = None
+        try:
+            groups: Dict[Tuple[int, str], Tuple[Any, List[type]]] = {}
+            for metric_cls in metric_classes:
+                if not metric_cls.sofascore_url:
+                    raise RuntimeError(f"sofascore_url not set on metric class {metric_cls.__name__}")
+                if not metric_cls._extractor:
+                    raise RuntimeError(f"extractor not provided for metric {metric_cls.__name__}")
+                scraper = metric_cls._scraper_instance
+                if not scraper:
+                    default_scraper = default_scraper or RequestsScraper()
+                    scraper = default_scraper
+                key = (id(scraper), metric_cls.sofascore_url)
+                groups.setdefault(key, (scraper, []))[1].append(metric_cls)
+
+            def thread_bound(scraper) -> bool:
+                return (isinstance(scraper, PlaywrightScraper)
+                        or isinstance(getattr(scraper, "fallback", None), PlaywrightScraper))
+
+            trees: Dict[Tuple[int, str], Any] = {}
+            results: Dict[type, Optional[str]] = {}
+            threaded = {k: g for k, g in groups.items() if not thread_bound(g[0])}
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {k: pool.submit(scraper.fetch_soup, k[1]) for k, (scraper, _) in threaded.items()}
+                for k, (scraper, _) in groups.items():
+                    if k not in threaded:
+                        trees[k] = scraper.fetch_soup(k[1])
+                for k, fut in futures.items():
+                    trees[k] = fut.result()
+
+                extracted = {metric_cls: pool.submit(metric_cls._extractor, trees[k])
+                             for k, (_, members) in threaded.items() for metric_cls in members}
+                for k, (_, members) in groups.items():
+                    if k not in threaded:
+                        for metric_cls in members:
+                            results[metric_cls] = metric_cls._extractor(trees[k])
+                for metric_cls, fut in extracted.items():
+                    results[metric_cls] = fut.result()
+        finally:
+            if default_scraper is not None:
+                default_scraper.close()
+
+        # keep the caller's ordering
+        return {metric_cls: results[metric_cls]
+                for _, members in groups.values() for metric_cls in members}
 
     @classmethod
     def get_value(cls) -> Optional[float]:
@@ -207,15 +953,12 @@ class MetricBase:
         if raw is None:
             return None
         raw = raw.strip()
-        # common patterns: "43%", "1.25", "12"
-        m = re.match(r"^(-?\d+(?:\.\d+)?)\s*%?$", raw)
+        # common patterns: "43%", "1.25", "12"; a percentage is returned as a number (e.g., 43)
+        m = _NUM_FULL.match(raw)
         if m:
-            val = float(m.group(1))
-            if raw.endswith("%"):
-                return val  # percentage as number (e.g., 43)
-            return val
+            return float(m.group(1))
         # try to extract numeric inside string
-        m2 = re.search(r"(-?\d+(?:\.\d+)?)", raw)
+        m2 = _NUM_EMBED.search(raw)
         if m2:
             return float(m2.group(1))
         # otherwise return raw
@@ -246,8 +989,10 @@ class MetricMeta(type):
               "Clean sheets": "css-selector-for-clean-sheets",
           }
 
-    After definition, TeamMetrics will have attributes like TeamMetrics.BallPossessionMetric
+    TeamMetrics will then have attributes like TeamMetrics.BallPossessionMetric
     which are classes subclassing MetricBase and exposing get_value()/refresh().
+    Discovery is lazy: defining the class does no network I/O; the page is scraped
+    on the first access to a not-yet-existing attribute, or by TeamMetrics.discover().
     """
 
     def __new__(mcls, name, bases, namespace):
@@ -271,27 +1016,60 @@ class MetricMeta(type):
         if not hasattr(scraper, "find_metrics"):
             raise RuntimeError("Provided scraper must implement find_metrics(url, metric_selectors)")
 
-        # Discover metrics: mapping metric_name -> extractor(soup)->value
-        discovered = scraper.find_metrics(sofascore_url, metric_selectors)
+        # Defer discovery to discover() / first attribute miss (see __getattr__)
+        cls._pending = (scraper, sofascore_url, metric_selectors)
+        cls._discovery_lock = threading.Lock()
+        return cls
 
-        for metric_name, extractor in discovered.items():
-            # create a safe pythonic class name
-            class_name = re.sub(r"[^0-9a-zA-Z]+", "", metric_name.title()) or "Metric"
-            class_name = class_name if class_name.endswith("Metric") else class_name + "Metric"
+    def discover(cls) -> Dict[str, type]:
+        """Scrape the page now if discovery is still pending on this class or a base;
+        return metric name -> class."""
+        discovered: Dict[str, type] = {}
+        for klass in reversed(cls.__mro__):
+            if "_discovery_lock" in klass.__dict__:
+                discovered.update(MetricMeta._discover_own(klass))
+        return discovered
 
-            metric_attrs = {
-                "metric_name": metric_name,
-                "sofascore_url": sofascore_url,
-                "_extractor": extractor,
-                "_scraper_instance": scraper,
-                "__doc__": f"Auto-generated metric class for '{metric_name}' from {sofascore_url}"
-            }
+    def _discover_own(cls) -> Dict[str, type]:
+        lock = cls.__dict__["_discovery_lock"]
+        with lock:
+            if cls.__dict__.get("_pending") is None:
+                return cls._discovered_metrics
+            scraper, sofascore_url, metric_selectors = cls._pending
 
-            metric_cls = type(class_name, (MetricBase,), metric_attrs)
-            # Attach to parent class
-            setattr(cls, class_name, metric_cls)
+            # Discover metrics: mapping metric_name -> extractor(tree)->value
+            discovered = scraper.find_metrics(sofascore_url, metric_selectors)
 
-        # Also attach a convenience mapping of names -> classes
-        setattr(cls, "_discovered_metrics", {k: getattr(cls, re.sub(r"[^0-9a-zA-Z]+", "", k.title()) + "Metric") for k in discovered.keys()})
+            generated = {}
+            for metric_name, extractor in discovered.items():
+                # create a safe pythonic class name
+                class_name = _CLASS_NAME_RE.sub("", metric_name.title()) or "Metric"
+                class_name = class_name if class_name.endswith("Metric") else class_name + "Metric"
 
-        return cls
+                metric_attrs = {
+                    "metric_name": metric_name,
+                    "sofascore_url": sofascore_url,
+                    "_extractor": extractor,
+                    "_scraper_instance": scraper,
+                    "__doc__": f"Auto-generated metric class for '{metric_name}' from {sofascore_url}"
+                }
+
+                metric_cls = type(class_name, (MetricBase,), metric_attrs)
+                # Attach to parent class
+                setattr(cls, class_name, metric_cls)
+                generated[metric_name] = metric_cls
+
+            # Also attach a convenience mapping of names -> classes
+            setattr(cls, "_discovered_metrics", generated)
+            cls._pending = None
+            return generated
+
+    def __getattr__(cls, name):
+        # Only called when normal lookup fails. Names discovery can create (generated
+        # ...Metric classes and _discovered_metrics) run any pending discovery on this
+        # class or a base, then retry the lookup once; anything else is a plain miss.
+        if name == "_discovered_metrics" or (name.endswith("Metric") and not name.startswith("_")):
+            if any(klass.__dict__.get("_pending") is not None for klass in cls.__mro__):
+                cls.discover()
+                return getattr(cls, name)
+        raise AttributeError(f"type object {cls.__name__!r} has no attribute {name!r}")